@@ -320,6 +320,9 @@ def main():
     parser.add_argument("--config", default="app/config.json", help="Configuration file path")
     parser.add_argument("--model-path", help="Override model path from config")
     parser.add_argument("--inference-steps", type=int, help="Override inference steps from config")
+    parser.add_argument("--host", help="Override server host from config")
+    parser.add_argument("--port", type=int, help="Override server port from config")
+    parser.add_argument("--no-share", action="store_true", help="Disable the public Gradio share link")
     
     args = parser.parse_args()
     
@@ -331,6 +334,12 @@ def main():
         app.config['model_path'] = args.model_path
     if args.inference_steps:
         app.config['inference_steps'] = args.inference_steps
+    if args.host:
+        app.config['server_config']['host'] = args.host
+    if args.port:
+        app.config['server_config']['port'] = args.port
+    if args.no_share:
+        app.config['server_config']['share'] = False
     
     # Launch the application
     try:
@@ -0,0 +1,810 @@
+#!/usr/bin/env python3
+"""
+VibeVoice Router
+A lightweight front for several VibeVoice Gradio instances (local processes or remote hosts).
+
+New sessions go to the least-loaded instance. Requests that name a reference voice through
+the ``X-VibeVoice-Voice`` header or ``voice`` query parameter are placed on a consistent-hash
+ring keyed by voice and model, with a bounded-load check against each instance's queue depth
+so a hot key cannot pile up on a single instance. The Gradio UI does not send either: it
+uploads the voice to whichever instance owns the session, so UI sessions are balanced by load
+only. Sessions stay on their instance through a cookie and the Gradio ``session_hash``.
+Instances can be drained (no new sessions, in-flight work finishes) before a restart.
+"""
+
+import os
+import re
+import sys
+import hmac
+import json
+import math
+import time
+import bisect
+import hashlib
+import logging
+import argparse
+import ipaddress
+import threading
+import socket
+import subprocess
+import http.client
+from http import cookies
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+AFFINITY_COOKIE = "vv_instance"
+VOICE_HEADER = "X-VibeVoice-Voice"
+MODEL_HEADER = "X-VibeVoice-Model"
+TOKEN_HEADER = "X-Router-Token"
+TOKEN_ENV = "VIBEVOICE_ROUTER_TOKEN"
+ADMIN_PREFIX = "/_router"
+
+# Headers that only make sense for a single hop and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade",
+}
+
+# Methods that can safely be replayed on another instance after an upstream failure
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Gradio's per-tab heartbeat stream, /heartbeat/<session_hash>; open as long as the tab is,
+# so it is not counted as work in flight
+HEARTBEAT_PATH_RE = re.compile(r"^/heartbeat/([^/?]+)")
+
+DEFAULT_MAX_BODY_SIZE = 100 * 1024 * 1024
+
+
+class Instance:
+    """A single upstream VibeVoice app instance."""
+
+    def __init__(self, name, url, process_args=None):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        self.name = name
+        self.url = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.scheme = parts.scheme
+        self.process_args = process_args
+        self.process = None
+        self.healthy = False
+        self.draining = False
+        self.queue_depth = 0
+        self.inflight = 0
+        self.last_seen = None
+        self.last_error = None
+
+    @property
+    def load(self):
+        """Work queued on the instance plus requests the router has in flight to it."""
+        return self.queue_depth + self.inflight
+
+    @property
+    def accepting(self):
+        """Whether the instance may be given new sessions."""
+        return self.healthy and not self.draining
+
+    def connect(self, timeout):
+        """Open an HTTP connection to the instance."""
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def start(self):
+        """Start the local app process for this instance, if it is router-managed."""
+        if self.process_args is None:
+            return
+        logger.info(f"🚀 Starting instance {self.name} on {self.url}")
+        self.process = subprocess.Popen(self.process_args)
+
+    def stop(self, timeout=30):
+        """Stop the local app process for this instance, if it is router-managed."""
+        if self.process is None or self.process.poll() is not None:
+            return
+        logger.info(f"🛑 Stopping instance {self.name}")
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def to_dict(self):
+        """Return a JSON-serialisable status snapshot."""
+        return {
+            "name": self.name,
+            "url": self.url,
+            "healthy": self.healthy,
+            "draining": self.draining,
+            "queue_depth": self.queue_depth,
+            "inflight": self.inflight,
+            "last_seen": self.last_seen,
+            "last_error": self.last_error,
+            "managed": self.process_args is not None,
+        }
+
+
+class HashRing:
+    """Consistent-hash ring over instance names using virtual nodes."""
+
+    def __init__(self, names, replicas=100):
+        self.replicas = replicas
+        self._keys = []
+        self._nodes = {}
+        for name in names:
+            for i in range(replicas):
+                point = self._hash(f"{name}#{i}")
+                self._nodes[point] = name
+                bisect.insort(self._keys, point)
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def candidates(self, key):
+        """Yield distinct instance names in ring order, starting at the owner of ``key``."""
+        if not self._keys:
+            return
+        start = bisect.bisect(self._keys, self._hash(key))
+        seen = set()
+        for offset in range(len(self._keys)):
+            name = self._nodes[self._keys[(start + offset) % len(self._keys)]]
+            if name not in seen:
+                seen.add(name)
+                yield name
+
+
+class VibeVoiceRouter:
+    """Routes requests across VibeVoice instances and tracks their health and load."""
+
+    def __init__(self, instances, default_model, load_factor=1.25, poll_interval=2.0,
+                 upstream_timeout=600, session_ttl=3600, admin_token=None,
+                 max_body_size=DEFAULT_MAX_BODY_SIZE):
+        self.instances = {instance.name: instance for instance in instances}
+        self.ring = HashRing(self.instances)
+        self.default_model = default_model
+        self.load_factor = load_factor
+        self.poll_interval = poll_interval
+        self.upstream_timeout = upstream_timeout
+        self.session_ttl = session_ttl
+        self.admin_token = admin_token
+        self.max_body_size = max_body_size
+        self.sessions = {}
+        self.lock = threading.Condition()
+        self._rotation = 0
+        self._stopped = threading.Event()
+        self._poller = None
+
+    # ----- Lifecycle -----
+
+    def start(self):
+        """Start managed instances and the background health poller."""
+        for instance in self.instances.values():
+            instance.start()
+        self.poll_once()
+        self._poller = threading.Thread(target=self._poll_loop, name="router-poller", daemon=True)
+        self._poller.start()
+
+    def shutdown(self):
+        """Stop the poller and any managed instances."""
+        self._stopped.set()
+        for instance in self.instances.values():
+            instance.stop()
+
+    # ----- Health and load -----
+
+    def _probe(self, instance):
+        """Fetch queue depth from an instance; returns None if it is unreachable."""
+        conn = instance.connect(timeout=min(self.poll_interval * 2, 10))
+        try:
+            conn.request("GET", "/queue/status")
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200:
+                # Reachable but without a queue endpoint: alive with no known backlog
+                return 0
+            try:
+                return int(json.loads(body).get("queue_size") or 0)
+            except (ValueError, AttributeError, TypeError):
+                return 0
+        except (OSError, http.client.HTTPException):
+            return None
+        finally:
+            conn.close()
+
+    def poll_once(self):
+        """Refresh health and queue depth for every instance."""
+        for instance in self.instances.values():
+            depth = self._probe(instance)
+            with self.lock:
+                was_healthy = instance.healthy
+                instance.healthy = depth is not None
+                # An unreachable instance has no queue we can wait on
+                instance.queue_depth = depth or 0
+                if depth is not None:
+                    instance.last_seen = time.time()
+                if instance.healthy != was_healthy:
+                    state = "✅ up" if instance.healthy else "❌ down"
+                    logger.info(f"Instance {instance.name} is {state}")
+                self.lock.notify_all()
+        self.prune_sessions()
+
+    def _poll_loop(self):
+        while not self._stopped.wait(self.poll_interval):
+            self.poll_once()
+
+    def mark_down(self, instance, error):
+        """Take ``instance`` out of rotation until the next successful poll."""
+        with self.lock:
+            if instance.healthy:
+                logger.warning(f"❌ Instance {instance.name} is down: {error}")
+            instance.healthy = False
+            instance.queue_depth = 0
+            instance.last_error = str(error)
+            self.lock.notify_all()
+
+    # ----- Sessions -----
+
+    def bind_session(self, session_hash, instance):
+        """Pin a Gradio ``session_hash`` to ``instance``."""
+        with self.lock:
+            self.sessions[session_hash] = (instance.name, time.time() + self.session_ttl)
+
+    def session_instance(self, session_hash):
+        """Return the live instance a Gradio ``session_hash`` is pinned to, if any."""
+        with self.lock:
+            entry = self.sessions.get(session_hash)
+            if entry is None or entry[1] < time.time():
+                return None
+            instance = self.instances[entry[0]]
+            return instance if instance.healthy else None
+
+    def prune_sessions(self):
+        """Forget expired session pins."""
+        now = time.time()
+        with self.lock:
+            for session_hash in [h for h, (_, expires) in self.sessions.items() if expires < now]:
+                del self.sessions[session_hash]
+
+    # ----- Routing -----
+
+    def routing_key(self, voice=None, model=None):
+        """Build the consistent-hash key for a reference voice and model, or None without a voice."""
+        if not voice:
+            return None
+        return f"{model or self.default_model}|{voice}"
+
+    def pick(self, key=None, exclude=()):
+        """
+        Choose an instance for a new session.
+
+        Without a ``key`` the least-loaded accepting instance wins, ties rotating between
+        instances. With a ``key`` the ring is walked from the key's owner and the first
+        accepting instance whose load stays within ``load_factor`` of the average is taken,
+        falling back to the least loaded.
+        """
+        with self.lock:
+            accepting = [
+                i for i in self.instances.values() if i.accepting and i.name not in exclude
+            ]
+            if not accepting:
+                return None
+            if key is not None:
+                total = sum(i.load for i in accepting) + 1
+                capacity = math.ceil(total / len(accepting) * self.load_factor)
+                for name in self.ring.candidates(key):
+                    instance = self.instances[name]
+                    if instance in accepting and instance.load + 1 <= capacity:
+                        return instance
+            self._rotation = (self._rotation + 1) % len(accepting)
+            rotated = accepting[self._rotation:] + accepting[:self._rotation]
+            return min(rotated, key=lambda i: i.load)
+
+    def acquire(self, instance):
+        """Record a request in flight to ``instance``."""
+        with self.lock:
+            instance.inflight += 1
+
+    def release(self, instance):
+        """Record a request to ``instance`` as finished."""
+        with self.lock:
+            instance.inflight -= 1
+            self.lock.notify_all()
+
+    # ----- Draining and restarts -----
+
+    def drain(self, name, timeout=300):
+        """
+        Stop sending new sessions to ``name`` and wait for its in-flight work to finish.
+
+        Returns True only if the instance went idle before ``timeout`` while still healthy.
+        """
+        instance = self.instances[name]
+        deadline = time.time() + timeout
+        with self.lock:
+            instance.draining = True
+            logger.info(f"🚰 Draining instance {name}")
+            while instance.load > 0:
+                if not instance.healthy:
+                    logger.warning(f"⚠️ Instance {name} went down while draining")
+                    return False
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.warning(f"⚠️ Drain of {name} timed out with load {instance.load}")
+                    return False
+                self.lock.wait(remaining)
+        logger.info(f"✅ Instance {name} drained")
+        return True
+
+    def resume(self, name):
+        """Allow ``name`` to receive new sessions again."""
+        with self.lock:
+            self.instances[name].draining = False
+            logger.info(f"▶️ Resumed instance {name}")
+
+    def restart(self, name, timeout=300, startup_timeout=600, force=False):
+        """
+        Drain, restart and resume a router-managed instance.
+
+        A crashed instance is restarted straight away since it has no work left to finish.
+        If a healthy instance does not drain in time the restart is aborted, unless ``force``
+        is set, and the instance goes back to its previous draining state. Returns True once
+        the instance is back up.
+        """
+        instance = self.instances[name]
+        if instance.process_args is None:
+            raise ValueError(f"Instance {name} is not managed by this router")
+        with self.lock:
+            was_draining = instance.draining
+            healthy = instance.healthy
+        if healthy and not self.drain(name, timeout) and instance.healthy and not force:
+            logger.error(f"❌ Restart of {name} aborted: drain did not complete")
+            with self.lock:
+                instance.draining = was_draining
+                instance.last_error = "restart aborted: drain did not complete"
+            return False
+        instance.stop()
+        with self.lock:
+            instance.healthy = False
+        instance.start()
+        deadline = time.time() + startup_timeout
+        with self.lock:
+            while not instance.healthy:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.error(f"❌ Instance {name} did not come back after restart")
+                    instance.last_error = "not healthy after restart"
+                    break
+                self.lock.wait(remaining)
+        # Resume either way so the instance rejoins rotation as soon as a poll sees it up
+        self.resume(name)
+        return instance.healthy
+
+    def status(self):
+        """Return a JSON-serialisable snapshot of all instances."""
+        with self.lock:
+            return {
+                "instances": [i.to_dict() for i in self.instances.values()],
+                "sessions": len(self.sessions),
+            }
+
+
+class BadRequest(Exception):
+    """A client request the router cannot parse."""
+
+    status = 400
+
+
+class PayloadTooLarge(BadRequest):
+    """A request body over the router's size limit."""
+
+    status = 413
+
+
+class RouterHandler(BaseHTTPRequestHandler):
+    """Reverse-proxies requests to the instance chosen by the router."""
+
+    protocol_version = "HTTP/1.1"
+    router = None
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    def do_PATCH(self):
+        self._dispatch()
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def do_OPTIONS(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        try:
+            if self.path.startswith(ADMIN_PREFIX + "/") or self.path == ADMIN_PREFIX:
+                if not self._authorized():
+                    # The body is left unread, so the connection cannot be reused
+                    self.close_connection = True
+                    return self._send_json(403, {"error": "Forbidden"})
+                self._read_body()
+                self._handle_admin()
+            else:
+                self._proxy(self._read_body())
+        except BadRequest as e:
+            self.close_connection = True
+            self._send_json(e.status, {"error": str(e)})
+
+    # ----- Admin endpoints -----
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _authorized(self):
+        """
+        Check admin access: the configured token is required when set, otherwise only
+        loopback clients may use the admin API.
+        """
+        token = self.router.admin_token
+        if token:
+            supplied = self.headers.get(TOKEN_HEADER, "")
+            authorization = self.headers.get("Authorization", "")
+            if not supplied and authorization.startswith("Bearer "):
+                supplied = authorization[len("Bearer "):]
+            return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+        try:
+            return ipaddress.ip_address(self.client_address[0]).is_loopback
+        except ValueError:
+            return False
+
+    def _handle_admin(self):
+        """
+        Admin API (token or loopback only, checked in ``_dispatch``):
+          GET  /_router/status
+          POST /_router/drain/<name>[?timeout=seconds]
+          POST /_router/resume/<name>
+          POST /_router/restart/<name>[?timeout=seconds&force=1]
+        """
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path[len(ADMIN_PREFIX):].split("/") if s]
+        query = parse_qs(parts.query)
+        try:
+            timeout = float(query.get("timeout", ["300"])[0])
+        except ValueError:
+            raise BadRequest("timeout must be a number of seconds")
+        if not timeout >= 0:
+            raise BadRequest("timeout must be a number of seconds")
+        force = query.get("force", ["0"])[0].lower() in ("1", "true", "yes")
+
+        if segments == ["status"] and self.command in ("GET", "HEAD"):
+            return self._send_json(200, self.router.status())
+        if len(segments) != 2 or self.command != "POST":
+            return self._send_json(404, {"error": "Unknown router endpoint"})
+
+        action, name = segments
+        if name not in self.router.instances:
+            return self._send_json(404, {"error": f"Unknown instance: {name}"})
+
+        if action == "drain":
+            drained = self.router.drain(name, timeout)
+            return self._send_json(200, {"instance": name, "drained": drained})
+        if action == "resume":
+            self.router.resume(name)
+            return self._send_json(200, {"instance": name, "resumed": True})
+        if action == "restart":
+            if self.router.instances[name].process_args is None:
+                return self._send_json(400, {"error": f"Instance {name} is not managed by this router"})
+            threading.Thread(
+                target=self.router.restart,
+                kwargs={"name": name, "timeout": timeout, "force": force},
+                daemon=True,
+            ).start()
+            return self._send_json(202, {"instance": name, "restarting": True})
+        return self._send_json(404, {"error": f"Unknown action: {action}"})
+
+    # ----- Proxying -----
+
+    def _read_body(self):
+        """Read the request body, de-chunking it if necessary, up to ``max_body_size``."""
+        limit = self.router.max_body_size
+        too_large = PayloadTooLarge(f"Request body exceeds {limit} bytes")
+        try:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                total = 0
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    total += size
+                    if total > limit:
+                        raise too_large
+                    if size == 0:
+                        # Consume trailers up to the terminating blank line
+                        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                            pass
+                        break
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                return b"".join(chunks)
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise BadRequest("Malformed request body framing")
+        if length < 0:
+            raise BadRequest("Malformed request body framing")
+        if length > limit:
+            raise too_large
+        return self.rfile.read(length) if length else b""
+
+    def _session_hash(self, body):
+        """Extract the Gradio session hash from the query string, path or JSON body."""
+        parts = urlsplit(self.path)
+        session_hash = parse_qs(parts.query).get("session_hash", [None])[0]
+        if session_hash:
+            return session_hash
+        match = HEARTBEAT_PATH_RE.match(parts.path)
+        if match:
+            return match.group(1)
+        if body and "json" in self.headers.get("Content-Type", ""):
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return None
+            if isinstance(payload, dict) and isinstance(payload.get("session_hash"), str):
+                return payload["session_hash"]
+        return None
+
+    def _cookie_instance(self):
+        """Return the name stored in the affinity cookie, if any."""
+        jar = cookies.SimpleCookie()
+        try:
+            jar.load(self.headers.get("Cookie", ""))
+        except cookies.CookieError:
+            return None
+        morsel = jar.get(AFFINITY_COOKIE)
+        return morsel.value if morsel is not None else None
+
+    def _routing_key(self):
+        query = parse_qs(urlsplit(self.path).query)
+        voice = self.headers.get(VOICE_HEADER) or query.get("voice", [None])[0]
+        model = self.headers.get(MODEL_HEADER) or query.get("model", [None])[0]
+        return self.router.routing_key(voice, model)
+
+    def _choose_instance(self, session_hash, cookie_name):
+        """
+        Return ``(instance, pinned)``. A live Gradio session stays on its healthy instance
+        even while it drains, so its jobs can finish. The cookie only pins to an instance
+        that accepts new sessions; a reload against a draining instance starts elsewhere.
+        """
+        if session_hash:
+            instance = self.router.session_instance(session_hash)
+            if instance is not None:
+                return instance, True
+        instance = self.router.instances.get(cookie_name)
+        if instance is not None and instance.accepting:
+            return instance, True
+        return self.router.pick(self._routing_key()), False
+
+    def _connect(self, instance):
+        """Open a connection to ``instance``; nothing has been sent if this fails."""
+        conn = instance.connect(timeout=self.router.upstream_timeout)
+        try:
+            conn.connect()
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _forward(self, conn, body):
+        """Send the request over ``conn`` and return the upstream response."""
+        headers = {
+            key: value for key, value in self.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() != "content-length"
+        }
+        headers["Content-Length"] = str(len(body))
+        headers["X-Forwarded-For"] = self.client_address[0]
+        headers["X-Forwarded-Host"] = self.headers.get("Host", "")
+        conn.request(self.command, self.path, body=body, headers=headers)
+        return conn.getresponse()
+
+    def _proxy(self, body):
+        session_hash = self._session_hash(body)
+        cookie_name = self._cookie_instance()
+        instance, pinned = self._choose_instance(session_hash, cookie_name)
+        work = HEARTBEAT_PATH_RE.match(urlsplit(self.path).path) is None
+        tried = set()
+
+        while True:
+            if instance is None:
+                return self._send_json(503, {"error": "No VibeVoice instance available"})
+            try:
+                conn = self._connect(instance)
+            except OSError as e:
+                # Connection refused or unreachable: the request never left the router
+                self.router.mark_down(instance, e)
+                tried.add(instance.name)
+                if pinned and self.command not in IDEMPOTENT_METHODS:
+                    # The session's state lives on the failed instance; replaying would break it
+                    return self._send_json(502, {"error": f"Upstream {instance.name} unavailable"})
+                instance, pinned = self.router.pick(self._routing_key(), exclude=tried), False
+                continue
+            break
+
+        if work:
+            self.router.acquire(instance)
+        try:
+            # Once the request is sent it may already be running, so never replay it
+            try:
+                response = self._forward(conn, body)
+            except socket.timeout:
+                logger.warning(f"⚠️ Upstream {instance.name} timed out")
+                return self._send_json(504, {"error": f"Upstream {instance.name} timed out"})
+            except (OSError, http.client.HTTPException) as e:
+                logger.error(f"❌ Upstream {instance.name} failed: {e}")
+                return self._send_json(502, {"error": f"Upstream {instance.name} failed"})
+            if session_hash:
+                self.router.bind_session(session_hash, instance)
+            self._relay(instance, response, set_cookie=cookie_name != instance.name)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Client disconnected while streaming from {instance.name}")
+            self.close_connection = True
+        except (OSError, http.client.HTTPException) as e:
+            # Headers are already on the wire; all we can do is cut the response short
+            logger.error(f"❌ Upstream {instance.name} failed mid-response: {e}")
+            self.close_connection = True
+        finally:
+            conn.close()
+            if work:
+                self.router.release(instance)
+
+    def _relay(self, instance, response, set_cookie):
+        """Copy an upstream response to the client, streaming bodies without a length."""
+        self.send_response(response.status, response.reason)
+        length = response.getheader("Content-Length")
+        for key, value in response.getheaders():
+            if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() != "content-length":
+                self.send_header(key, value)
+        if set_cookie:
+            self.send_header(
+                "Set-Cookie",
+                f"{AFFINITY_COOKIE}={instance.name}; Max-Age={int(self.router.session_ttl)}; "
+                "Path=/; HttpOnly",
+            )
+        if length is not None:
+            self.send_header("Content-Length", length)
+        else:
+            # Streamed (e.g. server-sent events): delimit the body by closing the connection
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        if self.command == "HEAD":
+            return
+        while True:
+            chunk = response.read1(64 * 1024)
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            self.wfile.flush()
+
+
+def load_router_config(config_path):
+    """Load the optional ``router_config`` section from the app configuration file."""
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}, None
+    return config.get("router_config", {}), config.get("model_path")
+
+
+def build_instances(args, router_config):
+    """Create the instance list from remote URLs and/or locally spawned processes."""
+    instances = []
+    for i, url in enumerate(args.instance or router_config.get("instances", [])):
+        instances.append(Instance(f"remote-{i}", url))
+
+    spawn = args.spawn if args.spawn is not None else router_config.get("spawn", 0)
+    base_port = args.base_port or router_config.get("base_port", 7861)
+    for i in range(spawn):
+        port = base_port + i
+        process_args = [
+            sys.executable, APP_SCRIPT,
+            "--config", args.config,
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--no-share",
+        ]
+        if args.model_path:
+            process_args += ["--model-path", args.model_path]
+        instances.append(Instance(f"local-{i}", f"http://127.0.0.1:{port}", process_args))
+    return instances
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Route requests across VibeVoice instances")
+    parser.add_argument("--config", default="app/config.json", help="Configuration file path")
+    parser.add_argument("--host", default=None, help="Router bind address")
+    parser.add_argument("--port", type=int, default=None, help="Router port")
+    parser.add_argument("--instance", action="append",
+                        help="URL of an already running instance (repeatable)")
+    parser.add_argument("--spawn", type=int, default=None,
+                        help="Number of local app instances to start and manage")
+    parser.add_argument("--base-port", type=int, default=None,
+                        help="First port used for spawned local instances")
+    parser.add_argument("--model-path", help="Model path for spawned instances and routing")
+    parser.add_argument("--load-factor", type=float, default=None,
+                        help="Max load of a chosen instance relative to the average")
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="Seconds between instance health/queue polls")
+    parser.add_argument("--session-ttl", type=int, default=None,
+                        help="Seconds a session stays pinned to its instance")
+    parser.add_argument("--max-body-mb", type=float, default=None,
+                        help="Largest request body the router accepts, in MB")
+
+    args = parser.parse_args()
+
+    router_config, model_path = load_router_config(args.config)
+    instances = build_instances(args, router_config)
+    if not instances:
+        parser.error("no instances: pass --instance URL and/or --spawn N")
+
+    router = VibeVoiceRouter(
+        instances,
+        default_model=args.model_path or model_path or "microsoft/VibeVoice-1.5B",
+        load_factor=args.load_factor or router_config.get("load_factor", 1.25),
+        poll_interval=args.poll_interval or router_config.get("poll_interval", 2.0),
+        session_ttl=args.session_ttl or router_config.get("session_ttl", 3600),
+        admin_token=os.environ.get(TOKEN_ENV) or router_config.get("admin_token"),
+        max_body_size=int(
+            (args.max_body_mb or router_config.get("max_body_mb", DEFAULT_MAX_BODY_SIZE / 2**20))
+            * 2**20
+        ),
+    )
+    RouterHandler.router = router
+
+    host = args.host or router_config.get("host", "0.0.0.0")
+    port = args.port or router_config.get("port", 7860)
+    server = ThreadingHTTPServer((host, port), RouterHandler)
+    server.daemon_threads = True
+
+    if not router.admin_token:
+        logger.info(f"🔒 No {TOKEN_ENV} set: admin API limited to localhost")
+
+    router.start()
+    logger.info(f"🚀 Routing {host}:{port} across {len(instances)} instance(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("👋 Router stopped by user")
+    finally:
+        server.server_close()
+        router.shutdown()
+
+
+if __name__ == "__main__":
+    main()
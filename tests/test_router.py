@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Router tests against stub upstreams on localhost; no model or Gradio required.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import unittest
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import router as vv_router  # noqa: E402
+
+
+class StubUpstream:
+    """A tiny HTTP server standing in for one VibeVoice instance."""
+
+    def __init__(self, name, port=0):
+        self.name = name
+        self.queue_size = 0
+        self.hits = []
+        self.gate = threading.Event()
+        self.gate.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if self.path.startswith("/queue/status"):
+                    body = json.dumps({"queue_size": stub.queue_size}).encode("utf-8")
+                else:
+                    stub.hits.append(self.path)
+                    if self.path.startswith(("/slow", "/heartbeat/")):
+                        stub.gate.wait(10)
+                    body = stub.name.encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The router gave up on this request (e.g. upstream timeout tests)
+                    pass
+
+            do_GET = _reply
+            do_POST = _reply
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def close(self):
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HashRingTests(unittest.TestCase):
+
+    def test_same_key_same_owner(self):
+        ring = vv_router.HashRing(["a", "b", "c"])
+        owners = {next(ring.candidates("model|alice")) for _ in range(20)}
+        self.assertEqual(len(owners), 1)
+
+    def test_candidates_cover_every_instance_once(self):
+        ring = vv_router.HashRing(["a", "b", "c"])
+        self.assertEqual(sorted(ring.candidates("model|alice")), ["a", "b", "c"])
+
+    def test_keys_spread_across_instances(self):
+        ring = vv_router.HashRing(["a", "b", "c"])
+        counts = {"a": 0, "b": 0, "c": 0}
+        for i in range(3000):
+            counts[next(ring.candidates(f"model|voice-{i}"))] += 1
+        for count in counts.values():
+            self.assertGreater(count, 600)
+
+    def test_removing_instance_only_moves_its_keys(self):
+        full = vv_router.HashRing(["a", "b", "c"])
+        reduced = vv_router.HashRing(["a", "b"])
+        for i in range(500):
+            key = f"model|voice-{i}"
+            owner = next(full.candidates(key))
+            if owner != "c":
+                self.assertEqual(next(reduced.candidates(key)), owner)
+
+
+class RouterTestCase(unittest.TestCase):
+    """Starts three stub upstreams and a router front on ephemeral ports."""
+
+    admin_token = None
+
+    def setUp(self):
+        self.stubs = [StubUpstream(f"up-{i}") for i in range(3)]
+        instances = [vv_router.Instance(stub.name, stub.url) for stub in self.stubs]
+        self.router = vv_router.VibeVoiceRouter(
+            instances, default_model="test-model", poll_interval=0.1,
+            upstream_timeout=10, admin_token=self.admin_token,
+        )
+        self.router.start()
+        handler = type("Handler", (vv_router.RouterHandler,), {"router": self.router})
+        self.front = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.front.daemon_threads = True
+        self.port = self.front.server_address[1]
+        threading.Thread(
+            target=self.front.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def tearDown(self):
+        self.router.shutdown()
+        self.front.shutdown()
+        self.front.server_close()
+        for stub in self.stubs:
+            stub.close()
+
+    def wait_for(self, condition, timeout=5):
+        """Poll ``condition`` until it is true or ``timeout`` passes."""
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                self.fail("condition not met in time")
+            time.sleep(0.01)
+
+    def request(self, method="GET", path="/", body=None, headers=None):
+        """Send a request through the router; returns (status, body, headers)."""
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, response.read().decode("utf-8"), response
+        finally:
+            conn.close()
+
+
+class PickTests(RouterTestCase):
+
+    def test_new_sessions_spread_without_voice_key(self):
+        chosen = set()
+        for _ in range(9):
+            instance = self.router.pick(self.router.routing_key())
+            self.router.acquire(instance)
+            chosen.add(instance.name)
+        self.assertEqual(len(chosen), 3)
+        self.assertEqual({i.inflight for i in self.router.instances.values()}, {3})
+
+    def test_idle_new_sessions_rotate(self):
+        chosen = {self.router.pick().name for _ in range(6)}
+        self.assertEqual(len(chosen), 3)
+
+    def test_voice_key_is_sticky_when_idle(self):
+        key = self.router.routing_key("alice.wav", "test-model")
+        owners = {self.router.pick(key).name for _ in range(20)}
+        self.assertEqual(len(owners), 1)
+
+    def test_voice_key_falls_back_under_load(self):
+        key = self.router.routing_key("alice.wav", "test-model")
+        owner = self.router.pick(key)
+        owner.queue_depth = 10
+        self.assertNotEqual(self.router.pick(key).name, owner.name)
+
+    def test_draining_instance_gets_no_new_sessions(self):
+        self.router.instances["up-0"].draining = True
+        for i in range(20):
+            self.assertNotEqual(self.router.pick().name, "up-0")
+            key = self.router.routing_key(f"voice-{i}")
+            self.assertNotEqual(self.router.pick(key).name, "up-0")
+
+
+class ProxyTests(RouterTestCase):
+
+    def test_cookie_pins_session(self):
+        status, first, response = self.request()
+        self.assertEqual(status, 200)
+        cookie = response.getheader("Set-Cookie")
+        self.assertIn(f"{vv_router.AFFINITY_COOKIE}={first}", cookie)
+        self.assertIn("Max-Age=", cookie)
+        for _ in range(5):
+            _, body, _ = self.request(headers={"Cookie": f"{vv_router.AFFINITY_COOKIE}={first}"})
+            self.assertEqual(body, first)
+
+    def test_session_hash_pins_cookieless_client(self):
+        join = json.dumps({"session_hash": "abc123", "data": []})
+        _, joined, _ = self.request(
+            "POST", "/queue/join", body=join, headers={"Content-Type": "application/json"}
+        )
+        for _ in range(5):
+            _, body, _ = self.request(path="/queue/data?session_hash=abc123")
+            self.assertEqual(body, joined)
+
+    def test_unpinned_request_retries_when_instance_down(self):
+        dead = self.stubs[0]
+        dead.close()
+        served = {self.request()[1] for _ in range(6)}
+        self.assertNotIn(dead.name, served)
+        self.assertFalse(self.router.instances[dead.name].healthy)
+
+    def test_drain_refuses_new_sessions_but_finishes_pinned(self):
+        target = self.stubs[0]
+        pinned = {"Cookie": f"{vv_router.AFFINITY_COOKIE}={target.name}"}
+        target.gate.clear()
+        slow = threading.Thread(target=self.request, kwargs={"path": "/slow", "headers": pinned})
+        slow.start()
+        self.addCleanup(slow.join)
+        while self.router.instances[target.name].inflight == 0:
+            threading.Event().wait(0.01)
+
+        result = {}
+        drainer = threading.Thread(
+            target=lambda: result.setdefault("drained", self.router.drain(target.name, 10))
+        )
+        drainer.start()
+        while not self.router.instances[target.name].draining:
+            threading.Event().wait(0.01)
+
+        for _ in range(6):
+            self.assertNotEqual(self.request()[1], target.name)
+        self.assertTrue(drainer.is_alive())
+
+        target.gate.set()
+        drainer.join(10)
+        self.assertTrue(result["drained"])
+
+        self.router.resume(target.name)
+        self.assertIn(target.name, {self.request()[1] for _ in range(6)})
+
+    def test_cookie_pin_to_draining_instance_starts_new_session(self):
+        self.router.instances["up-0"].draining = True
+        cookie = {"Cookie": f"{vv_router.AFFINITY_COOKIE}=up-0"}
+        for _ in range(6):
+            self.assertNotEqual(self.request(headers=cookie)[1], "up-0")
+
+    def test_live_session_stays_on_draining_instance(self):
+        self.router.bind_session("live", self.router.instances["up-0"])
+        self.router.instances["up-0"].draining = True
+        for _ in range(3):
+            self.assertEqual(self.request(path="/queue/data?session_hash=live")[1], "up-0")
+
+    def test_heartbeat_stream_does_not_block_drain(self):
+        target = self.stubs[0]
+        target.gate.clear()
+        heartbeat = threading.Thread(
+            target=self.request,
+            kwargs={"path": "/heartbeat/tab1",
+                    "headers": {"Cookie": f"{vv_router.AFFINITY_COOKIE}={target.name}"}},
+        )
+        heartbeat.start()
+        self.addCleanup(heartbeat.join)
+        self.addCleanup(target.gate.set)
+        self.wait_for(lambda: target.hits)
+        self.assertEqual(self.router.instances[target.name].inflight, 0)
+        self.assertTrue(self.router.drain(target.name, 2))
+
+    def test_sent_request_is_not_replayed_on_timeout(self):
+        self.router.upstream_timeout = 0.5
+        for stub in self.stubs:
+            stub.gate.clear()
+        status, _, _ = self.request("POST", "/slow", body=b"{}")
+        for stub in self.stubs:
+            stub.gate.set()
+        self.assertEqual(status, 504)
+        self.assertEqual(sum(len(stub.hits) for stub in self.stubs), 1)
+        self.assertTrue(all(i.healthy for i in self.router.instances.values()))
+
+    def test_oversized_body_is_413(self):
+        self.router.max_body_size = 10
+        self.assertEqual(self.request("POST", "/", body=b"x" * 100)[0], 413)
+        status, _, _ = self.request(
+            "POST", "/", body=b"64\r\n" + b"x" * 100 + b"\r\n0\r\n\r\n",
+            headers={"Transfer-Encoding": "chunked"},
+        )
+        self.assertEqual(status, 413)
+        self.assertFalse(any(stub.hits for stub in self.stubs))
+
+    def test_drain_reports_failure_when_instance_dies(self):
+        target = self.router.instances["up-1"]
+        self.router.acquire(target)
+        threading.Timer(0.2, self.stubs[1].close).start()
+        self.assertFalse(self.router.drain("up-1", 10))
+
+
+class RestartTests(RouterTestCase):
+
+    def manage(self, index):
+        """Let the router restart stub ``index`` as if it were a local process."""
+        stub = self.stubs[index]
+        instance = self.router.instances[stub.name]
+        instance.process_args = ["stub"]
+        instance.stop = lambda timeout=30: stub.close()
+
+        def start():
+            self.stubs[index] = StubUpstream(stub.name, instance.port)
+
+        instance.start = start
+        return instance
+
+    def test_crashed_instance_restarts(self):
+        instance = self.manage(0)
+        self.stubs[0].queue_size = 2
+        self.wait_for(lambda: instance.queue_depth == 2)
+        self.stubs[0].close()
+        self.wait_for(lambda: not instance.healthy)
+        self.assertEqual(instance.queue_depth, 0)
+        self.assertTrue(self.router.restart("up-0", timeout=5, startup_timeout=5))
+        self.assertFalse(instance.draining)
+        self.assertTrue(instance.accepting)
+
+    def test_aborted_restart_restores_draining_state(self):
+        instance = self.manage(0)
+        self.router.acquire(instance)
+        self.assertFalse(self.router.restart("up-0", timeout=0.2))
+        self.assertFalse(instance.draining)
+        self.assertTrue(instance.healthy)
+
+        instance.draining = True
+        self.assertFalse(self.router.restart("up-0", timeout=0.2))
+        self.assertTrue(instance.draining)
+        self.router.release(instance)
+
+
+class AdminTests(RouterTestCase):
+
+    def test_status_from_localhost(self):
+        status, body, _ = self.request(path="/_router/status")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)["instances"]), 3)
+
+    def test_bad_timeout_is_400(self):
+        status, _, _ = self.request("POST", "/_router/drain/up-0?timeout=soon")
+        self.assertEqual(status, 400)
+        self.assertFalse(self.router.instances["up-0"].draining)
+
+    def test_malformed_chunked_body_is_400(self):
+        status, _, _ = self.request(
+            "POST", "/", body=b"zz\r\n", headers={"Transfer-Encoding": "chunked"}
+        )
+        self.assertEqual(status, 400)
+
+
+class AdminTokenTests(RouterTestCase):
+
+    admin_token = "s3cret"
+
+    def test_token_required(self):
+        self.assertEqual(self.request("POST", "/_router/drain/up-0")[0], 403)
+        self.assertFalse(self.router.instances["up-0"].draining)
+
+    def test_forbidden_before_body_is_read(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.putrequest("POST", "/_router/drain/up-0")
+            conn.putheader("Content-Length", str(10 ** 9))
+            conn.endheaders()
+            self.assertEqual(conn.getresponse().status, 403)
+        finally:
+            conn.close()
+
+    def test_token_accepted(self):
+        status, _, _ = self.request(
+            "POST", "/_router/drain/up-0", headers={vv_router.TOKEN_HEADER: "s3cret"}
+        )
+        self.assertEqual(status, 200)
+        self.assertTrue(self.router.instances["up-0"].draining)
+
+
+if __name__ == "__main__":
+    unittest.main()